@@ -1,14 +1,19 @@
+import asyncio
+from collections import Counter
+from datetime import date
+import json
+import os
+from pathlib import Path
+import tempfile
 import ccxt
+import ccxt.async_support as ccxt_async
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
-import time
+from tqdm.asyncio import tqdm_asyncio
 import random
+import time
 import logging
 import argparse
-from tabulate import tabulate
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,127 +22,439 @@ logger = logging.getLogger(__name__)
 # List of exchanges to scan
 EXCHANGES = ["binanceusdm", "kucoinfutures", "okx", "bybit", "krakenfutures", "hyperliquid"]
 
-def fetch_tickers(exchange_id):
+# Maximum number of in-flight funding rate requests per exchange
+CONCURRENCY = {
+    "binanceusdm": 10,
+    "kucoinfutures": 5,
+    "okx": 5,
+    "bybit": 10,
+    "krakenfutures": 5,
+    "hyperliquid": 3,
+}
+DEFAULT_CONCURRENCY = 5
+
+# Consecutive network failures after which an exchange is skipped, and for how many seconds
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30
+BREAKER = {exchange_id: {'fails': 0, 'open_until': 0} for exchange_id in EXCHANGES}
+
+# Quote (and settlement) currency of the perpetuals scanned on each exchange
+QUOTES = {
+    "krakenfutures": "USD",
+    "hyperliquid": "USDC",
+}
+DEFAULT_QUOTE = "USDT"
+
+# Directory holding the daily markets cache
+CACHE_DIR = Path("~/.cache/cfa").expanduser()
+
+# Columns collected for each exchange and symbol by fetch_funding_rates
+FUNDING_COLUMNS = ['fundingRate', 'interval_hours', 'pctAnnualFundingRate', 'exchange', 'norm_symbol']
+
+# Columns of the DataFrame returned by calculate_arbitrage_opportunities
+OPPORTUNITY_COLUMNS = ['symbol', 'exchange1', 'exchange2', 'rate1', 'rate2', 'spread', 'long_exchange', 'short_exchange']
+
+def create_clients():
+    """
+    Create one async client per exchange, shared by ticker discovery and funding rate fetches.
+    
+    Returns:
+        dict: A mapping of exchange IDs to ccxt.async_support clients.
+    """
+    return {exchange_id: getattr(ccxt_async, exchange_id)({"options":{'defaultType': 'swap'}, 'enableRateLimit': True})
+            for exchange_id in EXCHANGES}
+
+def is_scanned_market(market, exchange_id):
+    """
+    Check whether a market is a perpetual swap quoted and settled in the exchange's scanned currency.
+    
+    Args:
+        market (dict): A ccxt market.
+        exchange_id (str): The ID of the exchange.
+        
+    Returns:
+        bool: True if the market is scanned.
+    """
+    quote = QUOTES.get(exchange_id, DEFAULT_QUOTE)
+    return bool(market.get('swap')) and market.get('quote') == quote and market.get('settle') == quote
+
+async def fetch_tickers(client, exchange_id):
     """
-    Fetch tickers for a given exchange.
+    Fetch perpetual swap symbols for a given exchange.
+    
+    Uses market metadata rather than live tickers, so no prices or volumes are downloaded.
+    The markets stay loaded on the client for the funding rate requests that follow.
     
     Args:
+        client (ccxt.async_support.Exchange): The async exchange client.
         exchange_id (str): The ID of the exchange to fetch tickers from.
         
     Returns:
         list: A list of ticker symbols for the given exchange.
     """
-    exchange_client = getattr(ccxt, exchange_id)()
+    markets = await client.load_markets()
+    return [m['symbol'] for m in markets.values() if is_scanned_market(m, exchange_id)]
+
+def markets_cache_path():
+    """
+    Get the path of today's markets cache file.
+    
+    Returns:
+        Path: The cache file path, keyed by the current date.
+    """
+    return CACHE_DIR / f"markets-{date.today()}.json"
+
+def load_cached_markets():
+    """
+    Load today's cached markets, if they hold a non-empty set of markets for every exchange being scanned.
+    
+    Returns:
+        dict or None: A mapping of exchange IDs to ccxt markets, or None if there is no usable cache.
+    """
+    cache_path = markets_cache_path()
+    try:
+        with open(cache_path) as f:
+            all_markets = json.load(f)
+    except (OSError, ValueError):
+        return None
     
-    if exchange_id == "krakenfutures":
-        x = exchange_client.fetchTickers()
-        return [y for y in x.keys() if y.split(":")[0][-4:] == "/USD"]
-    elif exchange_id == "kucoinfutures":
-        x = exchange_client.fetchMarkets()
-        return [x['symbol'] for x in x if x['symbol'][-5:] == ":USDT"]
-    elif exchange_id in ["okx", "gate"]:
-        x = exchange_client.fetchTickers()
-        return [y for y in x.keys() if y[-5:] == "/USDT"]
-    elif exchange_id in ["bybit", "binanceusdm"]:
-        x = exchange_client.fetchTickers()
-        return [y for y in x.keys() if y[-5:] == ":USDT"]
-    elif exchange_id == "hyperliquid":
-        x = exchange_client.fetchMarkets()
-        return [market['symbol'] for market in x if market['quote'] == 'USDC']
+    if not isinstance(all_markets, dict):
+        return None
+    if not all(isinstance(all_markets.get(exchange_id), dict) and all_markets[exchange_id] for exchange_id in EXCHANGES):
+        return None
+    return {exchange_id: all_markets[exchange_id] for exchange_id in EXCHANGES}
 
-def fetch_funding_rate_with_retry(client, raw_symbol, exchange_id, max_retries=5, initial_delay=1):
+def save_cached_markets(all_markets):
     """
-    Fetch funding rate with retry mechanism for rate limiting.
+    Save the scanned markets to today's cache file and remove caches from previous days.
+    
+    Only the markets kept by fetch_tickers are stored, since funding rate requests need nothing else.
+    
+    Args:
+        all_markets (dict): A mapping of exchange IDs to ccxt markets.
+    """
+    cache_path = markets_cache_path()
+    scanned_markets = {exchange_id: {symbol: market for symbol, market in markets.items()
+                                     if is_scanned_market(market, exchange_id)}
+                       for exchange_id, markets in all_markets.items()}
+    
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a failed dump never leaves a truncated cache behind
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix='markets-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(scanned_markets, f)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write markets cache to {cache_path}: {str(e)}")
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    for old_path in cache_path.parent.glob('markets-*.json'):
+        if old_path != cache_path:
+            try:
+                old_path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove old markets cache {old_path}: {str(e)}")
+
+def record_failure(exchange_id):
+    """
+    Record a network failure for an exchange, opening its circuit breaker after too many in a row.
+    
+    Args:
+        exchange_id (str): The ID of the exchange.
+        
+    Returns:
+        bool: True if this failure opened the circuit breaker.
+    """
+    breaker = BREAKER[exchange_id]
+    breaker['fails'] += 1
+    if breaker['fails'] >= BREAKER_THRESHOLD and time.monotonic() >= breaker['open_until']:
+        breaker['open_until'] = time.monotonic() + BREAKER_COOLDOWN
+        logger.warning(f"{breaker['fails']} consecutive failures on {exchange_id}, skipping it for {BREAKER_COOLDOWN} seconds")
+        return True
+    return False
+
+async def fetch_funding_rate_with_retry(client, raw_symbol, exchange_id, max_retries=5, initial_delay=1):
+    """
+    Fetch funding rate with retry mechanism for rate limiting and transient network errors.
+    
+    Requests are skipped while the exchange's circuit breaker is open.
     
     Args:
-        client (ccxt.Exchange): The exchange client.
+        client (ccxt.async_support.Exchange): The async exchange client.
         raw_symbol (str): The raw symbol to fetch funding rate for.
         exchange_id (str): The ID of the exchange.
         max_retries (int): Maximum number of retries.
         initial_delay (float): Initial delay between retries in seconds.
         
     Returns:
-        list: A list of funding rate data.
+        list or None: A list of funding rate data, or None if the request was skipped because the
+            exchange's circuit breaker is open.
     """
+    breaker = BREAKER[exchange_id]
     for attempt in range(max_retries):
+        if time.monotonic() < breaker['open_until']:
+            return None
         try:
-            if exchange_id == "hyperliquid":
-                return client.fetchFundingRateHistory(raw_symbol, limit=2)
-            else:
-                return client.fetch_funding_rate_history(raw_symbol, limit=2)
+            rates = await client.fetch_funding_rate_history(raw_symbol, limit=2)
+            breaker['fails'] = 0
+            return rates
         except ccxt.RateLimitExceeded as e:
             if attempt == max_retries - 1:
                 raise
             delay = initial_delay * (2 ** attempt) + random.uniform(0, 1)
             logger.warning(f"Rate limit exceeded for {exchange_id}, retrying in {delay:.2f} seconds...")
-            time.sleep(delay)
+            await asyncio.sleep(delay)
+        except ccxt.NetworkError as e:
+            # Don't announce a retry that the just-opened breaker would skip
+            if record_failure(exchange_id) or attempt == max_retries - 1:
+                logger.error(f"Error fetching {raw_symbol} on {exchange_id}: {str(e)}")
+                return []
+            delay = initial_delay * (2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"Network error for {raw_symbol} on {exchange_id}, retrying in {delay:.2f} seconds...")
+            await asyncio.sleep(delay)
         except Exception as e:
             logger.error(f"Error fetching {raw_symbol} on {exchange_id}: {str(e)}")
             return []
 
-def fetch_funding_rates(exchange_id, symbol_map):
+async def fetch_symbol_funding_rates(client, semaphore, exchange_id, raw_symbol):
+    """
+    Fetch funding rates for a single symbol, waiting for a free request slot on the exchange.
+    
+    Args:
+        client (ccxt.async_support.Exchange): The async exchange client.
+        semaphore (asyncio.Semaphore): Limits concurrent requests to the exchange.
+        exchange_id (str): The ID of the exchange.
+        raw_symbol (str): The exchange-specific symbol.
+        
+    Returns:
+        list or None: A list of funding rate data for the symbol, or None if it was skipped by the circuit breaker.
+    """
+    async with semaphore:
+        return await fetch_funding_rate_with_retry(client, raw_symbol, exchange_id)
+
+def annualize_funding_rates(rates):
+    """
+    Annualize the latest funding rate, inferring the funding interval from the last two fundings.
+    
+    Args:
+        rates (list): Funding rate history for a single symbol on a single exchange.
+        
+    Returns:
+        tuple or None: The latest funding rate, the interval in hours, and the annualized rate in percent,
+            or None if there is no usable funding rate.
+    """
+    rates = sorted((r for r in rates if r.get('timestamp') is not None), key=lambda r: r['timestamp'])[-2:]
+    if not rates or rates[-1].get('fundingRate') is None:
+        return None
+    
+    # A single funding, or two at the same time, gives no interval so assume daily funding
+    interval_hours = round((rates[-1]['timestamp'] - rates[0]['timestamp']) / (1000 * 60 * 60)) or 24
+    funding_rate = rates[-1]['fundingRate']
+    return funding_rate, interval_hours, funding_rate * (365 * 24 / interval_hours) * 100
+
+async def fetch_funding_rates(client, exchange_id, symbol_map):
     """
-    Fetch funding rates for all symbols on a given exchange.
+    Fetch funding rates for all symbols on a given exchange concurrently.
     
     Args:
+        client (ccxt.async_support.Exchange): The async exchange client.
         exchange_id (str): The ID of the exchange.
         symbol_map (dict): A mapping of normalized symbols to raw symbols for each exchange.
         
     Returns:
-        list: A list of funding rate data for all symbols on the exchange.
+        dict: Column buffers holding one annualized funding rate row per symbol, with the exchange
+            and symbol stored as codes into EXCHANGES and symbol_map.
     """
-    client = getattr(ccxt, exchange_id)({"options":{'defaultType': 'swap'}})
-    data = []
+    columns = {column: [] for column in FUNDING_COLUMNS}
+    semaphore = asyncio.Semaphore(CONCURRENCY.get(exchange_id, DEFAULT_CONCURRENCY))
+    exchange_code = EXCHANGES.index(exchange_id)
+    symbols = []
+    coros = []
     
-    for symbol, norm_to_raw in symbol_map.items():
+    for symbol_code, (symbol, norm_to_raw) in enumerate(symbol_map.items()):
         if exchange_id in norm_to_raw:
             raw_symbol = norm_to_raw[exchange_id]
-            if exchange_id == "okx":
-                raw_symbol = raw_symbol.replace("/", "-") + "-SWAP"
-            
+            symbols.append((symbol_code, symbol))
+            coros.append(fetch_symbol_funding_rates(client, semaphore, exchange_id, raw_symbol))
+    
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    
+    skipped = 0
+    for (symbol_code, symbol), result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching {symbol} on {exchange_id}: {str(result)}")
+            continue
+        if result is None:
+            skipped += 1
+            continue
+        annualized = annualize_funding_rates(result)
+        if annualized is None:
+            continue
+        funding_rate, interval_hours, pct_annual_funding_rate = annualized
+        columns['fundingRate'].append(funding_rate)
+        columns['interval_hours'].append(interval_hours)
+        columns['pctAnnualFundingRate'].append(pct_annual_funding_rate)
+        columns['exchange'].append(exchange_code)
+        columns['norm_symbol'].append(symbol_code)
+    
+    if skipped:
+        logger.warning(f"Skipped {skipped} of {len(symbols)} symbols on {exchange_id} while its circuit breaker was open")
+    
+    return columns
+
+async def fetch_all_funding_rates(clients, symbol_map):
+    """
+    Fetch funding rates for all exchanges concurrently.
+    
+    Args:
+        clients (dict): A mapping of exchange IDs to async exchange clients.
+        symbol_map (dict): A mapping of normalized symbols to raw symbols for each exchange.
+        
+    Returns:
+        pd.DataFrame: The latest annualized funding rate for each exchange and symbol.
+    """
+    results = await tqdm_asyncio.gather(*[fetch_funding_rates(clients[exchange_id], exchange_id, symbol_map) for exchange_id in EXCHANGES],
+                                        desc="Fetching funding rates")
+    
+    # Concatenate in EXCHANGES order so rows, and the pairs built from them, are stable between runs
+    columns = {column: [value for exchange_columns in results for value in exchange_columns[column]]
+               for column in FUNDING_COLUMNS}
+    
+    return pd.DataFrame({
+        'fundingRate': np.asarray(columns['fundingRate'], dtype='float64'),
+        'interval_hours': np.asarray(columns['interval_hours'], dtype='int64'),
+        'pctAnnualFundingRate': np.asarray(columns['pctAnnualFundingRate'], dtype='float64'),
+        'exchange': pd.Categorical.from_codes(columns['exchange'], EXCHANGES),
+        'norm_symbol': pd.Categorical.from_codes(columns['norm_symbol'], list(symbol_map)),
+    })
+
+def build_symbol_map(all_tickers):
+    """
+    Map normalized symbols listed on at least two exchanges to each listing exchange's raw symbol.
+    
+    Args:
+        all_tickers (dict): A mapping of exchange IDs to ticker symbols.
+        
+    Returns:
+        dict: A mapping of normalized symbols to raw symbols for each exchange.
+    """
+    # Map each exchange's base assets to its raw symbols, splitting every ticker once
+    base_maps = {exchange_id: {} for exchange_id in EXCHANGES}
+    for exchange_id, tickers in all_tickers.items():
+        for ticker in tickers:
+            base_maps[exchange_id].setdefault(ticker.split("/")[0], ticker)
+
+    unique_tickers = Counter(base for bases in base_maps.values() for base in bases)
+    # An arbitrage needs two legs, and exchanges that don't list the symbol are left out entirely
+    symbols = [ticker for ticker, count in unique_tickers.items() if count >= 2]
+
+    # Unified symbols are passed to ccxt as-is; any exchange-specific rewrite belongs here, not in the request path
+    return {symbol: {exchange_id: base_maps[exchange_id][symbol] for exchange_id in EXCHANGES if symbol in base_maps[exchange_id]}
+            for symbol in symbols}
+
+async def fetch_all_data(use_cache=True):
+    """
+    Discover tickers and fetch funding rates for all exchanges.
+    
+    Args:
+        use_cache (bool): Whether to reuse today's cached markets.
+        
+    Returns:
+        pd.DataFrame: The latest annualized funding rate for each exchange and symbol.
+    """
+    clients = create_clients()
+    try:
+        # Restore today's markets if available, so load_markets() makes no requests
+        cached_markets = load_cached_markets() if use_cache else None
+        if cached_markets is not None:
             try:
-                rates = fetch_funding_rate_with_retry(client, raw_symbol, exchange_id)
-                for r in rates:
-                    r['exchange'] = exchange_id
-                    r['norm_symbol'] = symbol
-                    data.append(r)
+                for exchange_id, client in clients.items():
+                    client.set_markets(cached_markets[exchange_id])
+                logger.info(f"Loaded markets from cache {markets_cache_path()}")
             except Exception as e:
-                logger.error(f"Error fetching {symbol} on {exchange_id}: {str(e)}")
-    
-    return data
+                # Start over with fresh clients so none keep partially restored markets
+                logger.warning(f"Ignoring unusable markets cache {markets_cache_path()}: {str(e)}")
+                cached_markets = None
+                await asyncio.gather(*[client.close() for client in clients.values()])
+                clients = create_clients()
+
+        # Discover tickers on all exchanges concurrently, skipping any exchange that fails.
+        # tqdm_asyncio.gather has no return_exceptions, so failures are returned per exchange instead.
+        async def discover(exchange_id):
+            try:
+                return await fetch_tickers(clients[exchange_id], exchange_id)
+            except Exception as e:
+                return e
+
+        results = await tqdm_asyncio.gather(*[discover(exchange_id) for exchange_id in EXCHANGES],
+                                            desc="Fetching tickers")
+        all_tickers = {}
+        for exchange_id, result in zip(EXCHANGES, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching tickers on {exchange_id}: {str(result)}")
+                continue
+            all_tickers[exchange_id] = result
+
+        # Only cache a complete set of markets
+        if cached_markets is None and len(all_tickers) == len(EXCHANGES):
+            save_cached_markets({exchange_id: clients[exchange_id].markets for exchange_id in EXCHANGES})
 
-def calculate_arbitrage_opportunities(data):
+        symbol_map = build_symbol_map(all_tickers)
+        logger.info(f'Assets found: {len(symbol_map)}')
+
+        # Fetch funding rates concurrently across all exchanges
+        return await fetch_all_funding_rates(clients, symbol_map)
+    finally:
+        await asyncio.gather(*[client.close() for client in clients.values()])
+
+def calculate_arbitrage_opportunities(data, min_spread=1.0):
     """
     Calculate arbitrage opportunities from funding rate data.
     
     Args:
         data (pd.DataFrame): Funding rate data for all exchanges and symbols.
+        min_spread (float): Minimum spread to consider.
         
     Returns:
         pd.DataFrame: A DataFrame of arbitrage opportunities.
     """
-    spreads = []
-    for symbol, group in data.groupby('norm_symbol'):
+    columns = {column: [] for column in OPPORTUNITY_COLUMNS}
+    for symbol, group in data.groupby('norm_symbol', observed=True):
         if len(group) < 2:
             continue
-        for i, row1 in group.iterrows():
-            for j, row2 in group.iterrows():
-                if i < j:
-                    spread = abs(row1['pctAnnualFundingRate'] - row2['pctAnnualFundingRate'])
-                    spreads.append({
-                        'symbol': symbol,
-                        'exchange1': row1['exchange'],
-                        'exchange2': row2['exchange'],
-                        'rate1': row1['pctAnnualFundingRate'],
-                        'rate2': row2['pctAnnualFundingRate'],
-                        'spread': spread
-                    })
-
-    spreads_df = pd.DataFrame(spreads)
-    opportunities = spreads_df[spreads_df['spread'] > 1.0]
-
-    opportunities['long_exchange'] = opportunities.apply(lambda row: row['exchange1'] if row['rate1'] < row['rate2'] else row['exchange2'], axis=1)
-    opportunities['short_exchange'] = opportunities.apply(lambda row: row['exchange2'] if row['rate1'] < row['rate2'] else row['exchange1'], axis=1)
+        ex = group['exchange'].to_numpy()
+        r = group['pctAnnualFundingRate'].to_numpy()
+
+        # Every unordered pair of exchanges for this symbol, keeping only those above the threshold
+        i, j = np.triu_indices(len(r), 1)
+        diff = r[i] - r[j]
+        spread = np.abs(diff)
+        keep = spread >= min_spread
+        if not keep.any():
+            continue
+        i, j, diff = i[keep], j[keep], diff[keep]
+
+        columns['symbol'].append(np.full(len(i), symbol, dtype=object))
+        columns['exchange1'].append(ex[i])
+        columns['exchange2'].append(ex[j])
+        columns['rate1'].append(r[i])
+        columns['rate2'].append(r[j])
+        columns['spread'].append(spread[keep])
+        columns['long_exchange'].append(np.where(diff < 0, ex[i], ex[j]))
+        columns['short_exchange'].append(np.where(diff < 0, ex[j], ex[i]))
+
+    if not columns['spread']:
+        return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+
+    opportunities = pd.DataFrame({column: np.concatenate(arrays) for column, arrays in columns.items()})
 
     return opportunities.sort_values('spread', ascending=False)
 
@@ -149,80 +466,43 @@ def visualize_opportunities(opportunities, top_n=10):
         opportunities (pd.DataFrame): DataFrame of arbitrage opportunities.
         top_n (int): Number of top opportunities to visualize.
     """
+    # Plotting libraries are slow to import, so only load them when a chart is drawn
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     top_opportunities = opportunities.head(top_n)
     
+    # One bar per opportunity, since a symbol can appear once for each pair of exchanges
+    positions = range(len(top_opportunities))
     plt.figure(figsize=(12, 6))
-    sns.barplot(x='symbol', y='spread', data=top_opportunities)
+    plt.bar(positions, top_opportunities['spread'])
     plt.title(f'Top {top_n} Arbitrage Opportunities')
     plt.xlabel('Symbol')
     plt.ylabel('Spread (%)')
-    plt.xticks(rotation=45)
+    plt.xticks(positions, top_opportunities['symbol'], rotation=45)
     plt.tight_layout()
     plt.savefig('arbitrage_opportunities.png')
     logger.info("Visualization saved as 'arbitrage_opportunities.png'")
 
-def main(min_spread=1.0, top_n=10):
+def main(min_spread=1.0, top_n=10, use_cache=True):
     logger.info("Starting Crypto Arbitrage Scanner")
     
-    # Fetch tickers sequentially
-    all_tickers = {}
-    for exchange_id in tqdm(EXCHANGES, desc="Fetching tickers"):
-        all_tickers[exchange_id] = fetch_tickers(exchange_id)
-        time.sleep(1)  # Add a small delay between exchanges
-
-    # Process tickers
-    unique_tickers = {}
-    for tickers in all_tickers.values():
-        for ticker in tickers:
-            ticker = ticker.split("/")[0]
-            unique_tickers[ticker] = unique_tickers.get(ticker, 0) + 1
-
-    symbols = [ticker for ticker, count in unique_tickers.items() if count == len(EXCHANGES)]
-
-    # Create symbol map
-    symbol_map = {symbol: {exchange_id: next((tick for tick in all_tickers[exchange_id] if tick.split("/")[0] == symbol), None) 
-                           for exchange_id in EXCHANGES} 
-                  for symbol in symbols}
-
-    logger.info(f'Assets found: {len(symbols)}')
-
-    # Fetch funding rates sequentially
-    all_data = []
-    for exchange_id in tqdm(EXCHANGES, desc="Fetching funding rates"):
-        all_data.extend(fetch_funding_rates(exchange_id, symbol_map))
-        time.sleep(1)  # Add a small delay between exchanges
-
-    # Process data
-    data = pd.DataFrame(all_data)
-    data = data.drop('info', axis=1, errors='ignore')
-    data = data.sort_values(['exchange', 'norm_symbol', 'timestamp'])
-
-    # Calculate intervals
-    data['interval_hours'] = data.groupby(['exchange', 'norm_symbol'])['timestamp'].diff() / (1000 * 60 * 60)
-    data['interval_hours'] = data['interval_hours'].fillna(0).round()
-
-    # Keep only the latest data for each exchange and symbol
-    data = data.groupby(['exchange', 'norm_symbol']).last().reset_index()
-
-    # Calculate rates
-    data['annual_adj_mult'] = 365 * 24 / data['interval_hours'].replace(0, 24)
-    data['annualFundingRate'] = data['fundingRate'] * data['annual_adj_mult']
-    data['pctAnnualFundingRate'] = data['annualFundingRate'] * 100
+    # Fetch tickers and funding rates using one shared client per exchange
+    data = asyncio.run(fetch_all_data(use_cache))
 
     # Calculate arbitrage opportunities
-    opportunities = calculate_arbitrage_opportunities(data)
-    
-    # Filter opportunities based on minimum spread
-    filtered_opportunities = opportunities[opportunities['spread'] >= min_spread]
+    opportunities = calculate_arbitrage_opportunities(data, min_spread)
     
     # Display top opportunities
-    top_opportunities = filtered_opportunities.head(top_n)
+    from tabulate import tabulate
+    top_opportunities = opportunities.head(top_n)
     print("\nTop Arbitrage Opportunities:")
     print(tabulate(top_opportunities[['symbol', 'long_exchange', 'short_exchange', 'spread']], 
                    headers='keys', tablefmt='pretty', floatfmt='.2f'))
 
     # Visualize opportunities
-    visualize_opportunities(filtered_opportunities, top_n)
+    visualize_opportunities(opportunities, top_n)
 
     logger.info("Crypto Arbitrage Scanner completed successfully")
 
@@ -230,6 +510,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Crypto Arbitrage Scanner")
     parser.add_argument("--min_spread", type=float, default=1.0, help="Minimum spread to consider (default: 1.0)")
     parser.add_argument("--top_n", type=int, default=10, help="Number of top opportunities to display (default: 10)")
+    parser.add_argument("--no_cache", action="store_true", help="Ignore cached markets and fetch them from the exchanges")
     args = parser.parse_args()
 
-    main(args.min_spread, args.top_n)
\ No newline at end of file
+    main(args.min_spread, args.top_n, not args.no_cache)
\ No newline at end of file